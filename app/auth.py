@@ -1,57 +1,207 @@
 # app/auth.py
 import os
+import asyncio
+import hmac
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 import bcrypt
-from jose import JWTError, jwt
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from cachetools import LRUCache, TTLCache
+import jwt
+from jwt import InvalidTokenError
+from sqlalchemy import Row, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 from app.models import User
-from app.database import get_db
+from app.database import CPU_COUNT, WEB_CONCURRENCY, get_db
 
 # lê do .env
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "troque_esta_string_por_uma_muito_aleatoria")
-ALGORITHM = os.getenv("ALGORITHM", "HS256")
+ALGORITHM = os.getenv("ALGORITHM") or "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# o pool de hash existe em cada worker: divide os cores entre eles pra que o
+# total de bcrypts simultâneos não passe do número de CPUs
+HASH_WORKERS = int(
+    os.getenv("HASH_WORKERS") or max(1, CPU_COUNT // WEB_CONCURRENCY)
+)
+
+# janela de tempo aceitável pra um hash bcrypt no hardware de produção
+HASH_TARGET_MIN_MS = 50
+HASH_TARGET_MAX_MS = 500
+
+logger = logging.getLogger(__name__)
+
+# chave preparada uma vez: bytes pro HMAC, ou o objeto da chave se o segredo
+# for um PEM (RS256/ES256), em vez de reprocessar a cada encode/decode
+_SIGNING_KEY = jwt.get_algorithm_by_name(ALGORITHM).prepare_key(SECRET_KEY)
+_VERIFY_KEY = _SIGNING_KEY.public_key() if hasattr(_SIGNING_KEY, "public_key") else _SIGNING_KEY
 
 # esquema HTTP-Bearer pra Swagger / FastAPI
 bearer_scheme = HTTPBearer()
 
 
+# pool só pro bcrypt: o hashpw/checkpw solta o GIL, então threads já usam todos
+# os cores, e o threadpool do anyio fica livre pro resto das requests.
+_hash_pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="bcrypt")
+
+
 def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+
+# cache de verificações bem-sucedidas: evita refazer o bcrypt em logins repetidos.
+# a chave é um HMAC (SECRET_KEY como pepper), nunca a senha em claro.
+_verify_cache = LRUCache(maxsize=1024)
+_verify_lock = threading.Lock()
+
+
+def _verify_key(password: str, hashed: str) -> bytes:
+    return hmac.new(SECRET_KEY.encode(), (password + hashed).encode(), hashlib.sha256).digest()
+
+
+def _verified_before(key: bytes) -> bool:
+    with _verify_lock:
+        return key in _verify_cache
+
+
+def _remember_verified(key: bytes) -> None:
+    with _verify_lock:
+        _verify_cache[key] = True
 
 
 def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode(), hashed.encode())
+    key = _verify_key(password, hashed)
+    if _verified_before(key):
+        return True
+    ok = bcrypt.checkpw(password.encode(), hashed.encode())
+    if ok:
+        _remember_verified(key)
+    return ok
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, hash_password, password)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    # o cache é consultado no event loop: um login repetido não entra na fila
+    # do _hash_pool, só o bcrypt.checkpw de um miss vai pra lá
+    key = _verify_key(password, hashed)
+    if _verified_before(key):
+        return True
+    loop = asyncio.get_running_loop()
+    ok = await loop.run_in_executor(
+        _hash_pool, bcrypt.checkpw, password.encode(), hashed.encode()
+    )
+    if ok:
+        _remember_verified(key)
+    return ok
+
+
+async def check_hash_cost() -> float:
+    """
+    Mede um hash com o BCRYPT_ROUNDS atual e avisa se ficar fora
+    da janela HASH_TARGET_MIN_MS..HASH_TARGET_MAX_MS.
+    """
+    start = time.perf_counter()
+    await hash_password_async("autoteste")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if elapsed_ms > HASH_TARGET_MAX_MS:
+        logger.warning(
+            "bcrypt com %d rounds levou %.0f ms (> %d ms): login/registro vão ficar lentos",
+            BCRYPT_ROUNDS, elapsed_ms, HASH_TARGET_MAX_MS,
+        )
+    elif elapsed_ms < HASH_TARGET_MIN_MS:
+        logger.warning(
+            "bcrypt com %d rounds levou %.0f ms (< %d ms): considere aumentar BCRYPT_ROUNDS",
+            BCRYPT_ROUNDS, elapsed_ms, HASH_TARGET_MIN_MS,
+        )
+    return elapsed_ms
+
+
+# credenciais de login já lidas: email -> Row(id, nome, senha_hash). Só guarda
+# usuários existentes, então um cadastro novo nunca fica mascarado pelo cache.
+_login_cache = TTLCache(maxsize=10_000, ttl=5)
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Row | None:
+    row = _login_cache.get(email)
+    if row is not None:
+        return row
+    # Core select com só as colunas do login (id, nome, senha_hash): sem montar
+    # objeto ORM. lambda_stmt: compilado uma vez; `email` vira bind param
+    result = await db.execute(lambda_stmt(
+        lambda: select(User.id, User.nome, User.senha_hash)
+        .where(User.email == email)
+        .limit(1)
+    ))
+    row = result.first()
+    if row is not None:
+        _login_cache[email] = row
+    return row
 
 
-def get_user_by_email(db: Session, email: str) -> User:
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_id(db: AsyncSession, user_id: int) -> User:
+    # busca por PK: usa o identity map da sessão antes de ir ao banco
+    return await db.get(User, user_id)
 
 
-def create_jwt_token(user: User) -> str:
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+def create_jwt_token(user: User | Row) -> str:
+    # epoch em segundos direto: é o formato que vai no token
+    now = int(time.time())
     payload = {
         "sub": str(user.id),
         "nome": user.nome,
-        "iat": datetime.utcnow(),
-        "exp": expire
+        "iat": now,
+        "exp": now + ACCESS_TOKEN_EXPIRE_MINUTES * 60
     }
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(payload, _SIGNING_KEY, algorithm=ALGORITHM)
+
+
+# tokens já validados: sha256(token) -> (payload, exp). Evita HMAC + parse a cada
+# request; o TTL curto limita por quanto tempo um token fica só no cache.
+TOKEN_CACHE_TTL = 5
+_token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL)
+_token_lock = threading.Lock()
+
+# usuários já autenticados: id -> User (desanexado da sessão). TTL curto limita
+# quanto tempo um usuário removido ainda passa pelo get_current_user.
+_user_cache = TTLCache(maxsize=10_000, ttl=30)
 
 
 def decode_jwt(token: str):
+    now = time.time()
+    key = hashlib.sha256(token.encode()).digest()
+    with _token_lock:
+        cached = _token_cache.get(key)
+    if cached is not None:
+        payload, exp = cached
+        if exp > now:
+            return payload
+        with _token_lock:
+            _token_cache.pop(key, None)
+        return None
+
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-    except JWTError:
+        payload = jwt.decode(token, _VERIFY_KEY, algorithms=[ALGORITHM])
+    except InvalidTokenError:
         return None
+    exp = payload.get("exp")
+    if exp is not None:
+        with _token_lock:
+            _token_cache[key] = (payload, exp)
+    return payload
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     Extrai o token do header Authorization,
@@ -74,11 +224,17 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user_id = int(user_id)
+    user = _user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    user = await get_user_by_id(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado",
         )
+    _user_cache[user_id] = user
 
     return user
@@ -0,0 +1,25 @@
+# app/bootstrap.py
+# Cria o schema do banco uma vez, antes de subir a API:
+#   python -m app.bootstrap
+import asyncio
+
+from sqlalchemy import text
+
+from app.database import Base, engine
+from app import models  # noqa: F401  (registra as tabelas no Base.metadata)
+
+
+async def create_schema():
+    # advisory lock: várias réplicas/workers rodando isso juntas não disputam o CREATE TABLE
+    async with engine.begin() as conn:
+        await conn.execute(text("SELECT pg_advisory_xact_lock(20251)"))
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def main():
+    await create_schema()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
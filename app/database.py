@@ -1,7 +1,7 @@
 # app/database.py
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from dotenv import load_dotenv
 
 # Carrega as variáveis de ambiente
@@ -14,14 +14,46 @@ DB_HOST = os.getenv("DB_HOST", "db")
 DB_PORT = os.getenv("DB_PORT", "5432")
 DB_NAME = os.getenv("DB_NAME", "projeto")
 
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# CPUs que o processo pode usar de fato (respeita cpuset/affinity, como o nproc);
+# os.cpu_count() conta todas as CPUs do host
+if hasattr(os, "sched_getaffinity"):
+    CPU_COUNT = len(os.sched_getaffinity(0))
+else:
+    CPU_COUNT = os.cpu_count() or 1
 
-def get_db():
-    db = SessionLocal()
-    try:
+# Número de workers do uvicorn (mesmo padrão do Dockerfile: um por CPU)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY") or CPU_COUNT)
+
+# Pool de conexões explícito (o padrão 5+10 segura as requests sob carga).
+# Cada worker tem o seu pool, então o total no Postgres é
+# (pool_size + max_overflow) * WEB_CONCURRENCY: por padrão o orçamento
+# DB_MAX_CONNECTIONS é dividido entre os workers, abaixo do max_connections=100.
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "90"))
+_per_worker = max(1, DB_MAX_CONNECTIONS // WEB_CONCURRENCY)
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW") or _per_worker // 3)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE") or max(1, _per_worker - DB_MAX_OVERFLOW))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "5000"))
+
+engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=True,
+    echo=False,
+    connect_args={"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}},
+)
+Base = declarative_base()
+
+SessionLocal = async_sessionmaker(
+    engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
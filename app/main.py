@@ -1,79 +1,149 @@
+import os
 import socket
-from datetime import datetime
-from typing import List, Dict, Union
-
-from fastapi import FastAPI, Depends, HTTPException, status, Security
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-
-from app.scraping import get_usd_brl_rate
-from app.database import get_db, engine
-from app.models   import Base, User
-from app.schemas  import UserCreate, UserLogin, Token
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi.middleware.gzip import GZipMiddleware
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.middleware import StaticCORSMiddleware
+from app.responses import ORJSONResponse
+from app.scraping import get_usd_brl_rate, open_client, close_client
+from app.bootstrap import create_schema
+from app.database import WEB_CONCURRENCY, get_db, engine
+from app.models   import User
+from app.schemas  import (
+    UserCreate, UserLogin, UserLoginStruct, Token, decode_user_login
+)
 from app.auth     import (
-    hash_password, verify_password,
-    get_user_by_email, create_jwt_token, decode_jwt, get_current_user
+    hash_password_async, verify_password_async, check_hash_cost,
+    get_user_by_email, create_jwt_token, get_current_user
 )
 
 
-# Cria as tabelas se ainda não existirem
-Base.metadata.create_all(bind=engine)
+AUTO_CREATE_SCHEMA = os.getenv("AUTO_CREATE_SCHEMA", "0").lower() in ("1", "true")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # o schema é criado pelo app.bootstrap antes do uvicorn; em dev, dá pra
+    # pedir a criação no startup com AUTO_CREATE_SCHEMA=1
+    if AUTO_CREATE_SCHEMA:
+        await create_schema()
+    await check_hash_cost()
+    open_client()
+    yield
+    await close_client()
+    await engine.dispose()
+
 
 app = FastAPI(
     title="API RESTful Projeto 2025.1",
     version="1.0.0",
-    description="Cadastro, login e endpoint protegido com JWT"
-)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"], allow_methods=["*"], allow_headers=["*"],
+    description="Cadastro, login e endpoint protegido com JWT",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
+# CORS liberado pra qualquer origem, sem o custo por request do CORSMiddleware
+app.add_middleware(StaticCORSMiddleware)
+# só comprime respostas grandes (ex.: /openapi.json); health, token e cotação
+# ficam bem abaixo do mínimo e passam direto
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=1)
+
+# o hostname não muda durante a vida do processo
+HOSTNAME = socket.gethostname()
+_HEALTH_BASE = {"status": "ok", "hostname": HOSTNAME}
+
+# timestamp do health check em resolução de segundo: formata uma vez por segundo
+_timestamp_cache: tuple[int, str] = (0, "")
 
-bearer_scheme = HTTPBearer()
 
-@app.post("/registrar", response_model=Token, summary="Registrar usuário")
-def registrar(user: UserCreate, db: Session = Depends(get_db)):
-    if get_user_by_email(db, user.email):
+def _utc_timestamp() -> str:
+    global _timestamp_cache
+    now = int(time.time())
+    if now != _timestamp_cache[0]:
+        _timestamp_cache = (now, datetime.fromtimestamp(now, timezone.utc).isoformat())
+    return _timestamp_cache[1]
+
+# Token só documenta a resposta (OpenAPI); não revalida o dict na saída
+@app.post("/registrar", responses={200: {"model": Token}}, summary="Registrar usuário")
+async def registrar(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    senha_hash = await hash_password_async(user.senha)
+    # um único INSERT: a constraint unique do email decide o 409, sem SELECT antes
+    stmt = (
+        pg_insert(User)
+        .values(nome=user.nome, email=user.email, senha_hash=senha_hash)
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+    novo = await db.scalar(stmt)
+    if novo is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Email já registrado."
         )
-    novo = User(
-        nome=user.nome,
-        email=user.email,
-        senha_hash=hash_password(user.senha)
-    )
-    db.add(novo)
-    db.commit()
-    db.refresh(novo)
+    await db.commit()
     token = create_jwt_token(novo)
-    return {"jwt": token}
+    return ORJSONResponse({"jwt": token})
 
-@app.post("/login", response_model=Token, summary="Login de usuário")
-def login(data: UserLogin, db: Session = Depends(get_db)):
-    db_user = get_user_by_email(db, data.email)
-    if not db_user or not verify_password(data.senha, db_user.senha_hash):
+# corpo decodificado com msgspec; o schema pydantic só entra na documentação
+@app.post(
+    "/login",
+    responses={
+        200: {"model": Token},
+        422: {
+            "description": "Validation Error",
+            "content": {"application/json": {
+                "schema": {"$ref": "#/components/schemas/HTTPValidationError"}
+            }},
+        },
+    },
+    summary="Login de usuário",
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": UserLogin.model_json_schema()}},
+    }},
+)
+async def login(
+    data: UserLoginStruct = Depends(decode_user_login),
+    db: AsyncSession = Depends(get_db),
+):
+    db_user = await get_user_by_email(db, data.email)
+    # bcrypt é CPU-bound: roda no pool dedicado pra não travar o event loop
+    if not db_user or not await verify_password_async(data.senha, db_user.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas."
         )
     token = create_jwt_token(db_user)
-    return {"jwt": token}
+    return ORJSONResponse({"jwt": token})
 
-@app.get("/consultar", summary="Cotação USD/BRL", response_model=Dict[str, Union[str, float]])
+@app.get("/consultar", summary="Cotação USD/BRL", response_class=ORJSONResponse)
 async def consultar(_=Depends(get_current_user)):
     """
     🔒 Endpoint protegido
     Retorna a cotação atual do dólar em relação ao real.
     """
     data = await get_usd_brl_rate()
-    return {"date": data["date"], "usd_brl": data["rate"]}
-
-@app.get("/health_check", summary="Health Check")
-def health_check():
-    return {
-        "status":    "ok",
-        "hostname":  socket.gethostname(),
-        "timestamp": datetime.utcnow().isoformat()
-    }
+    return ORJSONResponse({"date": data["date"], "usd_brl": data["rate"]})
+
+@app.get("/health_check", summary="Health Check", response_class=ORJSONResponse)
+async def health_check():
+    return ORJSONResponse(_HEALTH_BASE | {"timestamp": _utc_timestamp()})
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=WEB_CONCURRENCY,
+        log_level="warning",
+    )
@@ -0,0 +1,49 @@
+# app/middleware.py
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+ALLOW_ORIGIN = (b"access-control-allow-origin", b"*")
+ALLOW_METHODS = b"DELETE, GET, HEAD, OPTIONS, PATCH, POST, PUT"
+PREFLIGHT_MAX_AGE = b"600"
+
+
+class StaticCORSMiddleware:
+    """
+    CORS aberto (qualquer origem) em ASGI puro: só anexa um header fixo
+    às respostas e responde o preflight direto, sem montar Request/Headers
+    como o CORSMiddleware faz a cada request.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if scope["method"] == "OPTIONS":
+            request_headers = dict(scope["headers"])
+            if b"origin" in request_headers and b"access-control-request-method" in request_headers:
+                await self._preflight(request_headers, send)
+                return
+
+        async def send_with_cors(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), ALLOW_ORIGIN]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+    async def _preflight(self, request_headers: dict, send: Send) -> None:
+        headers = [
+            ALLOW_ORIGIN,
+            (b"access-control-allow-methods", ALLOW_METHODS),
+            (b"access-control-max-age", PREFLIGHT_MAX_AGE),
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", b"2"),
+        ]
+        requested = request_headers.get(b"access-control-request-headers")
+        if requested:
+            headers.append((b"access-control-allow-headers", requested))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"OK"})
@@ -0,0 +1,15 @@
+# app/responses.py
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse serializada com orjson (C/Rust) em vez do json da stdlib.
+    O ORJSONResponse do próprio FastAPI está deprecado nas versões novas.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
@@ -1,4 +1,29 @@
-from pydantic import BaseModel, EmailStr
+from typing import Annotated
+
+import idna
+import msgspec
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, EmailStr, Field, field_validator
+
+
+def normalizar_email(v: str) -> str:
+    # mesmos ajustes baratos que o EmailStr faz no cadastro: sem espaços nas
+    # pontas, aceita "Nome <email>", domínio punycode (xn--) em unicode e
+    # domínio em minúsculas
+    v = v.strip()
+    if v.endswith(">") and "<" in v:
+        v = v[v.rindex("<") + 1:-1].strip()
+    local, arroba, dominio = v.rpartition("@")
+    if not arroba or not local or not dominio:
+        raise ValueError("email inválido")
+    dominio = dominio.lower()
+    if "xn--" in dominio:
+        try:
+            dominio = idna.decode(dominio)
+        except idna.IDNAError:
+            raise ValueError("email inválido")
+    return f"{local}@{dominio}"
 
 class UserCreate(BaseModel):
     nome: str
@@ -6,8 +31,35 @@ class UserCreate(BaseModel):
     senha: str
 
 class UserLogin(BaseModel):
-    email: EmailStr
+    # sem EmailStr no login: a busca no banco já valida o email, aqui só o básico
+    email: str = Field(max_length=254)
     senha: str
 
+    @field_validator("email")
+    @classmethod
+    def email_com_arroba(cls, v: str) -> str:
+        return normalizar_email(v)
+
+class UserLoginStruct(msgspec.Struct):
+    """
+    Corpo do /login decodificado com msgspec (C), sem passar pelo pydantic.
+    O UserLogin acima continua descrevendo o corpo no OpenAPI.
+    """
+    email: Annotated[str, msgspec.Meta(max_length=254)]
+    senha: str
+
+_login_decoder = msgspec.json.Decoder(UserLoginStruct)
+
+async def decode_user_login(request: Request) -> UserLoginStruct:
+    try:
+        data = _login_decoder.decode(await request.body())
+        data.email = normalizar_email(data.email)
+    except (msgspec.DecodeError, ValueError) as e:
+        # mesmo formato de erro 422 das outras rotas (handler padrão do FastAPI)
+        raise RequestValidationError(
+            [{"type": "value_error", "loc": ("body",), "msg": str(e), "input": None}]
+        )
+    return data
+
 class Token(BaseModel):
     jwt: str
@@ -1,15 +1,59 @@
 # app/scraping.py
+import asyncio
+import time
 import httpx
-from datetime import datetime
+import orjson
+from datetime import datetime, timezone
 
 AWESOME_URL = "https://economia.awesomeapi.com.br/json/last/USD-BRL"
 
+# a cotação muda no máximo a cada poucos segundos: guarda a última por CACHE_TTL
+CACHE_TTL = 5.0
+_cache: tuple[float, dict] | None = None
+_lock = asyncio.Lock()
+
+# cliente compartilhado: reaproveita conexões (keep-alive) entre requests,
+# sem refazer TCP + TLS a cada /consultar. Aberto/fechado no lifespan do app.
+_client: httpx.AsyncClient | None = None
+
+
+def open_client() -> httpx.AsyncClient:
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=5,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            http2=True,
+        )
+    return _client
+
+
+async def close_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
 async def get_usd_brl_rate():
-    async with httpx.AsyncClient(timeout=5) as client:
-        r = await client.get(AWESOME_URL)
-        r.raise_for_status()
-        data = r.json().get("USDBRL") or {}
+    global _cache
+    if _cache is not None and time.monotonic() - _cache[0] < CACHE_TTL:
+        return _cache[1]
+    # single-flight: requests concorrentes esperam a mesma busca no upstream
+    async with _lock:
+        if _cache is not None and time.monotonic() - _cache[0] < CACHE_TTL:
+            return _cache[1]
+        data = await _fetch_usd_brl_rate()
+        _cache = (time.monotonic(), data)
+        return data
+
+
+async def _fetch_usd_brl_rate():
+    client = _client or open_client()
+    r = await client.get(AWESOME_URL)
+    r.raise_for_status()
+    data = orjson.loads(r.content).get("USDBRL") or {}
     return {
-        "date": data.get("create_date", datetime.utcnow().isoformat()),
+        "date": data.get("create_date", datetime.now(timezone.utc).isoformat(timespec="seconds")),
         "rate": float(data.get("bid", 0.0)),
     }